@@ -55,7 +55,7 @@ install_dependencies() {
     echo "Installing Python dependencies..."
     
     # Install requests globally (not recommended for shared systems)
-    python3 -m pip install --target="$LIBS_DIR" requests
+    python3 -m pip install --target="$LIBS_DIR" "httpx[http2]" orjson
 
     echo "All dependencies installed successfully."
 }
@@ -209,6 +209,35 @@ restart_services() {
     echo "All services restarted".    
 }
 
+# Long-running control loop so admin actions don't pay a fork+exec of this
+# script per command: the workload parser starts this once and sends
+# one-letter commands over a pair of named pipes.
+CTL_FIFO="/tmp/a1_services.ctl"
+ACK_FIFO="/tmp/a1_services.ack"
+
+control_loop() {
+    rm -f "$CTL_FIFO" "$ACK_FIFO"
+    mkfifo "$CTL_FIFO" "$ACK_FIFO"
+    echo "Control daemon listening on $CTL_FIFO..."
+    while true; do
+        if read -r CMD < "$CTL_FIFO"; then
+            case "$CMD" in
+                S) stop_services ;;
+                R) restart_services ;;
+                D) delete_data ;;
+                Q) ;;
+                *) echo "Unknown control command: $CMD" ;;
+            esac
+            # The ack tells the sender the action has completed
+            echo done > "$ACK_FIFO"
+            if [ "$CMD" = "Q" ]; then
+                break
+            fi
+        fi
+    done
+    rm -f "$CTL_FIFO" "$ACK_FIFO"
+}
+
 case "$1" in
     -c) compile ;;
     -u) start_user_service ;;
@@ -219,5 +248,6 @@ case "$1" in
     -d) delete_data ;;  # New command to delete data
     -s) stop_services ;; # Stops all running services
     -r) restart_services ;; # Restart all services
-    *) echo "Usage: ./runme.sh -c|-u|-p|-i|-o|-w workloadfile|-d|-s|-r" ;;
+    -l) control_loop ;; # Listen for control commands from the workload parser
+    *) echo "Usage: ./runme.sh -c|-u|-p|-i|-o|-w workloadfile|-d|-s|-r|-l" ;;
 esac
\ No newline at end of file
@@ -1,7 +1,27 @@
-import requests
-import time
+import argparse
+import asyncio
+import os
 import random
-from concurrent.futures import ThreadPoolExecutor
+import socket
+import sys
+from collections import deque
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'libs'))
+
+import httpx
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# The create/place payloads are fixed shapes with only the ids changing, so
+# they are kept as pre-encoded JSON templates and filled with bytes %-formatting
+# instead of building a dict and serializing it per request
+USER_TEMPLATE = b'{"command":"create","id":%d,"username":"user%d","email":"user%d@test.com","password":"password"}'
+PRODUCT_TEMPLATE = b'{"command":"create","id":%d,"name":"product%d","description":"desc","price":10.0,"quantity":50}'
+ORDER_TEMPLATE = b'{"command":"place order","id":"%d","product_id":%d,"user_id":%d,"quantity":1}'
+
+# How many (op, service) picks each worker pre-generates per refill; kept
+# modest so several hundred workers refilling at once stay cheap
+PLAN_CHUNK = 1_000
 
 services = [
     {"name": "UserService", "base_url": "http://127.0.0.1:14001/user"},
@@ -9,9 +29,6 @@ services = [
     {"name": "OrderService", "base_url": "http://127.0.0.1:14000/order"}
 ]
 
-global_success = {service["name"]: 0 for service in services}
-global_fail = {service["name"]: 0 for service in services}
-
 user_id = 1
 product_id = 1
 order_id = 1
@@ -20,90 +37,135 @@ def is_successful(status_code):
     # Success = only if the response is one of the expected application-level codes
     return status_code in [200, 400, 401, 404, 409]
 
-def send_request(service):
-    global user_id, product_id, order_id
-
-    if random.random() < 0.5:
-        # POST Request
-        if service["name"] == "UserService":
-            payload = {
-                "command": "create",
-                "id": user_id,
-                "username": f"user{user_id}",
-                "email": f"user{user_id}@test.com",
-                "password": "password"
-            }
-            url = service["base_url"]
-            user_id += 1
-        elif service["name"] == "ProductService":
-            payload = {
-                "command": "create",
-                "id": product_id,
-                "name": f"product{product_id}",
-                "description": "desc",
-                "price": 10.0,
-                "quantity": 50
-            }
-            url = service["base_url"]
-            product_id += 1
-        elif service["name"] == "OrderService":
-            if product_id == 1 or user_id == 1:
-                return True  # logically skip
-            payload = {
-                "command": "place order",
-                "id": str(order_id),
-                "product_id": random.randint(1, max(1, product_id - 1)),
-                "user_id": random.randint(1, max(1, user_id - 1)),
-                "quantity": 1
-            }
-            url = service["base_url"]
-            order_id += 1
-        else:
-            return True  # unknown service
-
-        try:
-            r = requests.post(url, json=payload, timeout=1)
-            return is_successful(r.status_code)
-        except Exception:
-            return False
-    else:
-        # GET Request
-        if service["name"] == "UserService":
-            url = f"{service['base_url']}/{random.randint(1, max(1, user_id - 1))}"
-        elif service["name"] == "ProductService":
-            url = f"{service['base_url']}/{random.randint(1, max(1, product_id - 1))}"
-        elif service["name"] == "OrderService":
-            url = f"{service['base_url']}/{random.randint(1, max(1, order_id - 1))}"
-        else:
-            return True
-
-        try:
-            r = requests.get(url, timeout=1)
-            return is_successful(r.status_code)
-        except Exception:
-            return False
-
-def run_test(duration=5, threads=50):
-    print(f"Starting load test for {duration} seconds with {threads} threads...\n")
-    end_time = time.time() + duration
-
-    def task():
-        while time.time() < end_time:
-            service = random.choice(services)
-            success = send_request(service)
+async def _send_post(client, url, body):
+    try:
+        # Drain the (tiny) body so httpcore can return the connection to the
+        # keep-alive pool, but never decode it: only the status matters here
+        request = client.build_request("POST", url, content=body, headers=JSON_HEADERS)
+        r = await client.send(request, stream=True)
+        await r.aread()
+        await r.aclose()
+        return is_successful(r.status_code)
+    except Exception:
+        return False
+
+async def _send_get(client, url):
+    try:
+        request = client.build_request("GET", url)
+        r = await client.send(request, stream=True)
+        await r.aread()
+        await r.aclose()
+        return is_successful(r.status_code)
+    except Exception:
+        return False
+
+async def _post_user(client, rng, service):
+    global user_id
+    body = USER_TEMPLATE % (user_id, user_id, user_id)
+    user_id += 1
+    return await _send_post(client, service["base_url"], body)
+
+async def _post_product(client, rng, service):
+    global product_id
+    body = PRODUCT_TEMPLATE % (product_id, product_id)
+    product_id += 1
+    return await _send_post(client, service["base_url"], body)
+
+async def _post_order(client, rng, service):
+    global order_id
+    if product_id == 1 or user_id == 1:
+        return True  # logically skip
+    body = ORDER_TEMPLATE % (order_id,
+                             rng.randint(1, max(1, product_id - 1)),
+                             rng.randint(1, max(1, user_id - 1)))
+    order_id += 1
+    return await _send_post(client, service["base_url"], body)
+
+async def _get_user(client, rng, service):
+    return await _send_get(client, f"{service['base_url']}/{rng.randint(1, max(1, user_id - 1))}")
+
+async def _get_product(client, rng, service):
+    return await _send_get(client, f"{service['base_url']}/{rng.randint(1, max(1, product_id - 1))}")
+
+async def _get_order(client, rng, service):
+    return await _send_get(client, f"{service['base_url']}/{rng.randint(1, max(1, order_id - 1))}")
+
+# op 0 = POST, op 1 = GET; the hot loop jumps straight to the right handler
+# through this table instead of re-branching on op and service name each time
+HANDLERS = {
+    (0, "UserService"): _post_user,
+    (0, "ProductService"): _post_product,
+    (0, "OrderService"): _post_order,
+    (1, "UserService"): _get_user,
+    (1, "ProductService"): _get_product,
+    (1, "OrderService"): _get_order,
+}
+
+def run_test(duration=5, concurrency=50):
+    print(f"Starting load test for {duration} seconds with {concurrency} workers...\n")
+
+    async def task(client, stopper):
+        # Each worker keeps its own counters and its own RNG so the hot loop
+        # never touches shared state; totals are summed once after the run.
+        # The (op, service) picks are pre-generated in bulk and replayed off
+        # a deque rather than rolled one at a time.
+        rng = random.Random()
+        local_success = {service["name"]: 0 for service in services}
+        local_fail = {service["name"]: 0 for service in services}
+        plan = deque()
+        # A single timer sets the event; workers just test a flag instead of
+        # reading the clock every iteration
+        while not stopper.is_set():
+            if not plan:
+                plan.extend(zip(rng.choices((0, 1), k=PLAN_CHUNK),
+                                rng.choices(services, k=PLAN_CHUNK)))
+            op, service = plan.popleft()
+            success = await HANDLERS[op, service["name"]](client, rng, service)
             if success:
-                global_success[service["name"]] += 1
+                local_success[service["name"]] += 1
             else:
-                global_fail[service["name"]] += 1
+                local_fail[service["name"]] += 1
+        return local_success, local_fail
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        stopper = asyncio.Event()
+        loop.call_later(duration, stopper.set)
+        # One shared client: every worker reuses the same bounded keep-alive
+        # pool. http2=True only engages via TLS ALPN, so against the cleartext
+        # http:// services everything rides HTTP/1.1 keep-alive connections;
+        # the flag is future-proofing for a TLS deployment. TCP_NODELAY keeps
+        # Nagle from sitting on the small JSON bodies.
+        limits = httpx.Limits(max_connections=100, max_keepalive_connections=100)
+        transport = httpx.AsyncHTTPTransport(
+            http2=True, limits=limits,
+            socket_options=[(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)])
+        async with httpx.AsyncClient(transport=transport, timeout=1.0) as client:
+            return await asyncio.gather(*[task(client, stopper) for _ in range(concurrency)])
+
+    results = asyncio.run(main())
 
-    with ThreadPoolExecutor(max_workers=threads) as executor:
-        for _ in range(threads):
-            executor.submit(task)
+    total_success = {service["name"]: 0 for service in services}
+    total_fail = {service["name"]: 0 for service in services}
+    for local_success, local_fail in results:
+        for name, count in local_success.items():
+            total_success[name] += count
+        for name, count in local_fail.items():
+            total_fail[name] += count
 
     print("\n==== FINAL RESULTS ====")
     for service in services:
-        total = global_success[service["name"]] + global_fail[service["name"]]
-        print(f"{service['name']}: {global_success[service['name']]} successful out of {total} attempted")
+        total = total_success[service["name"]] + total_fail[service["name"]]
+        print(f"{service['name']}: {total_success[service['name']]} successful out of {total} attempted")
 
 if __name__ == "__main__":
-    run_test(duration=5, threads=100)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Load test the a1 microservices.")
+    parser.add_argument("--duration", type=int, default=5,
+                        help="test length in seconds")
+    # Coroutine workers are cheap, so the ceiling scales with the machine
+    # instead of being pinned at 100
+    parser.add_argument("--concurrency", type=int,
+                        default=min(32 * (os.cpu_count() or 1), 512),
+                        help="number of concurrent workers")
+    args = parser.parse_args()
+    run_test(duration=args.duration, concurrency=args.concurrency)
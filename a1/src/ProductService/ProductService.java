@@ -3,6 +3,7 @@ package microservices;
 import com.sun.net.httpserver.HttpServer;
 import com.sun.net.httpserver.HttpHandler;
 import com.sun.net.httpserver.HttpExchange;
+import org.json.JSONArray;
 import org.json.JSONObject;
 import java.io.IOException;
 import java.io.OutputStream;
@@ -25,7 +26,7 @@ import java.util.concurrent.Executors;
 public class ProductService {
     private static int PORT;
     private static String DB_URL;
-    private static ExecutorService threadPool; 
+    private static ExecutorService threadPool;
 
     /**
      * The main method initializes the ProductService.
@@ -39,6 +40,7 @@ public class ProductService {
         setupDatabase();
         HttpServer server = HttpServer.create(new InetSocketAddress(PORT), 0);
         server.createContext("/product", new ProductHandler());
+        server.createContext("/product/bulk", new BulkHandler());
         server.createContext("/shutdown", new ShutdownHandler(server));
         threadPool = Executors.newFixedThreadPool(100);
         server.setExecutor(threadPool);        server.start();
@@ -90,12 +92,45 @@ public class ProductService {
         return DriverManager.getConnection(DB_URL);
     }
 
+    /**
+     * The outcome of a single product command: an HTTP status code and an
+     * optional JSON body.
+     */
+    static class CommandResult {
+        final int status;
+        final JSONObject body;
+
+        CommandResult(int status, JSONObject body) {
+            this.status = status;
+            this.body = body;
+        }
+    }
+
+    /**
+     * Writes a command result back to the client.
+     *
+     * @param exchange The HTTP exchange object.
+     * @param result The result to send.
+     * @throws IOException if an error occurs while sending the response.
+     */
+    private static void writeResult(HttpExchange exchange, CommandResult result) throws IOException {
+        if (result.body == null) {
+            exchange.sendResponseHeaders(result.status, -1);
+            return;
+        }
+        String jsonResponse = result.body.toString();
+        exchange.sendResponseHeaders(result.status, jsonResponse.length());
+        OutputStream os = exchange.getResponseBody();
+        os.write(jsonResponse.getBytes());
+        os.close();
+    }
+
     /**
      * Handles shutdown requests to terminate the ProductService gracefully.
      */
     static class ShutdownHandler implements HttpHandler {
         private final HttpServer server;
-        
+
          /**
          * Constructor to initialize the shutdown handler.
          *
@@ -104,7 +139,7 @@ public class ProductService {
         public ShutdownHandler(HttpServer server) {
             this.server = server;
         }
-    
+
         @Override
         public void handle(HttpExchange exchange) throws IOException {
             if ("POST".equalsIgnoreCase(exchange.getRequestMethod())) {
@@ -117,6 +152,38 @@ public class ProductService {
         }
     }
 
+    /**
+     * Handles batched commands posted to the `/product/bulk` endpoint.
+     * The request body carries {"commands": [...]} and the response returns
+     * one {"status": ..., "body": ...} entry per command, in order.
+     */
+    static class BulkHandler implements HttpHandler {
+        @Override
+        public void handle(HttpExchange exchange) throws IOException {
+            if (!"POST".equalsIgnoreCase(exchange.getRequestMethod())) {
+                exchange.sendResponseHeaders(405, -1);
+                return;
+            }
+            JSONObject request = new JSONObject(new String(exchange.getRequestBody().readAllBytes()));
+            if (!request.has("commands")) {
+                exchange.sendResponseHeaders(400, -1);
+                return;
+            }
+            JSONArray commands = request.getJSONArray("commands");
+            JSONArray results = new JSONArray();
+            for (int i = 0; i < commands.length(); i++) {
+                CommandResult result = ProductHandler.processCommand(commands.getJSONObject(i));
+                JSONObject entry = new JSONObject();
+                entry.put("status", result.status);
+                if (result.body != null) {
+                    entry.put("body", result.body);
+                }
+                results.put(entry);
+            }
+            writeResult(exchange, new CommandResult(200, new JSONObject().put("results", results)));
+        }
+    }
+
     /**
      * Handles incoming HTTP requests for the `/product` endpoint.
      */
@@ -141,24 +208,32 @@ public class ProductService {
          */
         private void handlePost(HttpExchange exchange) throws IOException {
             JSONObject request = new JSONObject(new String(exchange.getRequestBody().readAllBytes()));
+            writeResult(exchange, processCommand(request));
+        }
+
+        /**
+         * Applies a single create/update/delete command and returns its result.
+         * Kept free of the HTTP exchange so the bulk endpoint can reuse it.
+         *
+         * @param request The JSON command to apply.
+         * @return The result of the command.
+         */
+        static CommandResult processCommand(JSONObject request) {
             if (!request.has("command") || !request.has("id")) {
-                exchange.sendResponseHeaders(400, -1);
-                return;
+                return new CommandResult(400, null);
             }
 
-            // make sure all fields are present for create and delete commands  
+            // make sure all fields are present for create and delete commands
             if ("create".equals(request.getString("command")) ) {
                 if (!request.has("name") || !request.has("description") || !request.has("price") || !request.has("quantity")) {
-                    exchange.sendResponseHeaders(400, -1);
-                    return;
+                    return new CommandResult(400, null);
                 }
             }
 
             // delete only needs name, price, and quantity if they are provided
             if ("delete".equals(request.getString("command")) ) {
                 if (!request.has("name") || !request.has("price") || !request.has("quantity")) {
-                    exchange.sendResponseHeaders(400, -1);
-                    return;
+                    return new CommandResult(400, null);
                 }
             }
 
@@ -168,8 +243,7 @@ public class ProductService {
             String name = null;
             if (request.has("name")) {
                 if (!(request.get("name") instanceof String)) {
-                    exchange.sendResponseHeaders(400, -1); // Bad Request
-                    return;
+                    return new CommandResult(400, null); // Bad Request
                 }
                 name = request.getString("name");
             }
@@ -177,57 +251,47 @@ public class ProductService {
             String description = null;
             if (request.has("description")) {
                 if (!(request.get("description") instanceof String)) {
-                    exchange.sendResponseHeaders(400, -1); // Bad Request
-                    return;
+                    return new CommandResult(400, null); // Bad Request
                 }
                 description = request.getString("description");
             }
-            
+
             Double price = null;
             if (request.has("price")) {
                 try {
                     price = request.getDouble("price"); // Will throw an exception if not a valid double
                 } catch (Exception e) {
                     System.out.println("Invalid price format. Must be a double.");
-                    exchange.sendResponseHeaders(400, -1); // Bad Request
-                    return;
+                    return new CommandResult(400, null); // Bad Request
                 }
             }
 
-            // check whether the quantity is provided as the right type 
+            // check whether the quantity is provided as the right type
             Integer quantity = null;
             if (request.has("quantity")) {
                 if (!(request.get("quantity") instanceof Integer)) {
-                    exchange.sendResponseHeaders(400, -1); // Bad Request
-                    return;
+                    return new CommandResult(400, null); // Bad Request
                 }
                 quantity = request.getInt("quantity");
             }
 
-            
-
-            
             try (Connection conn = connectDB()) {
                 if ("create".equals(command)) {
 
                     if (name.isEmpty() || description.isEmpty()) {
-                        exchange.sendResponseHeaders(400, -1);
-                        return;
+                        return new CommandResult(400, null);
                     }
 
                     if (productExists(id)) {
-                        exchange.sendResponseHeaders(409, -1);
-                        return;
+                        return new CommandResult(409, null);
                     }
 
                     if (price <= 0 ) {
-                        exchange.sendResponseHeaders(400, -1);
-                        return;
+                        return new CommandResult(400, null);
                     }
-                    
+
                     if (quantity < 0) {
-                        exchange.sendResponseHeaders(400, -1);
-                        return;
+                        return new CommandResult(400, null);
                     }
 
                     String sql = "INSERT INTO products (id, name, description, price, quantity) VALUES (?, ?, ?, ?, ?);";
@@ -238,44 +302,39 @@ public class ProductService {
                     stmt.setDouble(4, price);
                     stmt.setInt(5, quantity);
                     stmt.executeUpdate();
-                    
+
                 } else if ("update".equals(command)) {
                     if (!productExists(id)) {
-                        exchange.sendResponseHeaders(404, -1);
-                        return;
+                        return new CommandResult(404, null);
                     }
-                    
-                    // if all are null then return success 
+
+                    // if all are null then return success
                     if (name == null && description == null && price == null && quantity == null) {
-                        sendUpdateResponse(exchange, id);
-                        return;
+                        return fetchProduct(id);
                     }
-            
-                    // Only update the feilds that are provided 
+
+                    // Only update the feilds that are provided
                     StringBuilder sql = new StringBuilder("UPDATE products SET ");
                     boolean first = true;
                     if (name != null) {
                         if (name.isEmpty()) {
-                            exchange.sendResponseHeaders(400, -1);
-                            return;
+                            return new CommandResult(400, null);
                         }
                         sql.append("name = ?");
                         first = false;
                     }
                     if (description != null) {
                         if (description.isEmpty()) {
-                            exchange.sendResponseHeaders(400, -1);
-                            return;
+                            return new CommandResult(400, null);
                         }
                         if (!first) sql.append(", ");
                         sql.append("description = ?");
                         first = false;
-                        
+
                     }
                     if (price != null) {
                         if (request.has("price") && price <= 0) {
-                            exchange.sendResponseHeaders(400, -1);
-                            return;
+                            return new CommandResult(400, null);
                         }
                         if (!first) sql.append(", ");
                         sql.append("price = ?");
@@ -283,14 +342,13 @@ public class ProductService {
                     }
                     if (quantity != null) {
                         if (request.has("quantity") && quantity <= 0) {
-                            exchange.sendResponseHeaders(400, -1);
-                            return;
+                            return new CommandResult(400, null);
                         }
                         if (!first) sql.append(", ");
                         sql.append("quantity = ?");
                     }
                     sql.append(" WHERE id = ?;");
-                    
+
 
                     // Prepare the statement
                     PreparedStatement stmt = conn.prepareStatement(sql.toString());
@@ -314,18 +372,16 @@ public class ProductService {
                     // Execute the update
                     int rowsUpdated = stmt.executeUpdate();
                     if (rowsUpdated > 0) {
-                        sendUpdateResponse(exchange, id);
-                        return;
+                        return fetchProduct(id);
                     } else {
-                        exchange.sendResponseHeaders(404, -1); // No rows updated
+                        return new CommandResult(404, null); // No rows updated
                     }
-                    
+
                 } else if ("delete".equals(command)) {
                     if (!productExists(id)) {
-                        exchange.sendResponseHeaders(404, -1);
-                        return;
+                        return new CommandResult(404, null);
                     }
-                
+
                     // Only delete if all fields match the product found
                     // Get the product fields
                     String sql_find = "SELECT id, name, price, quantity FROM products WHERE id = ?;";
@@ -334,15 +390,14 @@ public class ProductService {
                     ResultSet rs = stmt_find.executeQuery();
                     if (rs.next()) {
                         if (!rs.getString("name").equals(name) || rs.getDouble("price") != price || rs.getInt("quantity") != quantity) {
-                            exchange.sendResponseHeaders(400, -1);
-                            return;
+                            return new CommandResult(400, null);
                         }
                     }
-                
+
                     String sql = "DELETE FROM products WHERE id = ?;";
                     PreparedStatement stmt = conn.prepareStatement(sql);
                     stmt.setInt(1, id);
-                
+
                     // Execute the delete
                     int rowsDeleted = stmt.executeUpdate();
                     if (rowsDeleted > 0) {
@@ -351,20 +406,15 @@ public class ProductService {
                         response.put("name", rs.getString("name"));
                         response.put("price", rs.getDouble("price"));
                         response.put("quantity", rs.getInt("quantity"));
-                
-                        String jsonResponse = response.toString();
-                        exchange.sendResponseHeaders(200, jsonResponse.length());
-                        OutputStream os = exchange.getResponseBody();
-                        os.write(jsonResponse.getBytes());
-                        os.close();
+                        return new CommandResult(200, response);
                     } else {
-                        exchange.sendResponseHeaders(404, -1); // No rows deleted
+                        return new CommandResult(404, null); // No rows deleted
                     }
                 }
-                sendJsonProductResponse(exchange, id, request);
+                return new CommandResult(200, productJson(request));
             } catch (SQLException e) {
-                exchange.sendResponseHeaders(500, -1);
                 e.printStackTrace();
+                return new CommandResult(500, null);
             }
         }
 
@@ -389,30 +439,7 @@ public class ProductService {
                 return;
             }
 
-            try (Connection conn = connectDB()) {
-                String sql = "SELECT id, name, description, price, quantity FROM products WHERE id = ?;";
-                PreparedStatement stmt = conn.prepareStatement(sql);
-                stmt.setInt(1, id);
-                ResultSet rs = stmt.executeQuery();
-                if (rs.next()) {
-                    JSONObject response = new JSONObject();
-                    response.put("id", rs.getInt("id"));
-                    response.put("name", rs.getString("name"));
-                    response.put("description", rs.getString("description"));
-                    response.put("price", rs.getDouble("price"));
-                    response.put("quantity", rs.getInt("quantity"));
-                    String jsonResponse = response.toString();
-                    exchange.sendResponseHeaders(200, jsonResponse.length());
-                    OutputStream os = exchange.getResponseBody();
-                    os.write(jsonResponse.getBytes());
-                    os.close();
-                } else {
-                    exchange.sendResponseHeaders(404, -1);
-                }
-            } catch (SQLException e) {
-                exchange.sendResponseHeaders(500, -1);
-                e.printStackTrace();
-            }
+            writeResult(exchange, fetchProduct(id));
         }
 
         /**
@@ -422,7 +449,7 @@ public class ProductService {
          * @return {@code true} if the product exists, otherwise {@code false}.
          * @throws SQLException if an error occurs while querying the database.
          */
-        private boolean productExists(int id) throws SQLException {
+        private static boolean productExists(int id) throws SQLException {
             try (Connection conn = connectDB()) {
                 String sql = "SELECT COUNT(*) FROM products WHERE id = ?;";
                 PreparedStatement stmt = conn.prepareStatement(sql);
@@ -433,39 +460,29 @@ public class ProductService {
         }
 
         /**
-         * Sends a JSON response back to the client.
+         * Builds the JSON body echoing a product command's fields.
          *
-         * @param exchange The HTTP exchange object.
-         * @param id The product ID.
          * @param postReq The JSON object containing the request data.
-         * @throws IOException If an error occurs while sending the response.
+         * @return The JSON body.
          */
-        private void sendJsonProductResponse(HttpExchange exchange, int id,JSONObject postReq  ) throws IOException {
-
+        private static JSONObject productJson(JSONObject postReq) {
             JSONObject response = new JSONObject();
             response.put("id", postReq.getInt("id"));
             response.put("name", postReq.getString("name"));
             response.put("description", postReq.getString("description"));
             response.put("price", postReq.getDouble("price"));
             response.put("quantity", postReq.getInt("quantity"));
-            String jsonResponse = response.toString();
-            exchange.sendResponseHeaders(200, jsonResponse.length());
-            OutputStream os = exchange.getResponseBody();
-            os.write(jsonResponse.getBytes());
-            os.close();
-            
+            return response;
         }
 
         /**
-         * Sends a JSON response back to the client after an update.
+         * Looks up a product and returns its current state as a command result.
          *
-         * @param exchange The HTTP exchange object.
-         * @param id The product ID.
-         * @throws IOException If an error occurs while sending the response.
+         * @param id The product ID to fetch.
+         * @return The command result (200 with the product, 404 if absent).
          */
-        private void sendUpdateResponse(HttpExchange exchange, int id ) throws IOException {
+        private static CommandResult fetchProduct(int id) {
             try (Connection conn = connectDB()) {
-                // Fetch the updated product and send it in the response
                 String sqlSelect = "SELECT id, name, description, price, quantity FROM products WHERE id = ?;";
                 PreparedStatement stmtSelect = conn.prepareStatement(sqlSelect);
                 stmtSelect.setInt(1, id);
@@ -478,26 +495,14 @@ public class ProductService {
                     response.put("description", rs.getString("description"));
                     response.put("price", rs.getDouble("price"));
                     response.put("quantity", rs.getInt("quantity"));
-
-                    String jsonResponse = response.toString();
-                    exchange.sendResponseHeaders(200, jsonResponse.length());
-                    OutputStream os = exchange.getResponseBody();
-                    os.write(jsonResponse.getBytes());
-                    os.close();
+                    return new CommandResult(200, response);
                 } else {
-                    exchange.sendResponseHeaders(500, -1); // Internal server error
+                    return new CommandResult(404, null);
                 }
             } catch (SQLException e) {
-                exchange.sendResponseHeaders(500, -1);
                 e.printStackTrace();
+                return new CommandResult(500, null);
             }
-            
         }
-
-        
-
-
     }
 }
-
-
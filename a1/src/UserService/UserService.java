@@ -3,6 +3,7 @@ package microservices;
 import com.sun.net.httpserver.HttpServer;
 import com.sun.net.httpserver.HttpHandler;
 import com.sun.net.httpserver.HttpExchange;
+import org.json.JSONArray;
 import org.json.JSONObject;
 import java.io.IOException;
 import java.io.OutputStream;
@@ -27,10 +28,10 @@ import java.util.concurrent.Executors;
 public class UserService {
     private static int PORT;
     private static String DB_URL;
-    private static ExecutorService threadPool; 
+    private static ExecutorService threadPool;
 
      /**
-     * Initializes the UserService, loads configurations, sets up the database, 
+     * Initializes the UserService, loads configurations, sets up the database,
      * and starts an HTTP server.
      *
      * @param args Command-line arguments (expects a path to config.json).
@@ -41,6 +42,7 @@ public class UserService {
         setupDatabase();
         HttpServer server = HttpServer.create(new InetSocketAddress(PORT), 0);
         server.createContext("/user", new UserHandler());
+        server.createContext("/user/bulk", new BulkHandler());
         server.createContext("/shutdown", new ShutdownHandler(server));
         threadPool = Executors.newFixedThreadPool(100);
         server.setExecutor(threadPool);        server.start();
@@ -116,12 +118,45 @@ public class UserService {
         }
     }
 
+    /**
+     * The outcome of a single user command: an HTTP status code and an
+     * optional JSON body.
+     */
+    static class CommandResult {
+        final int status;
+        final JSONObject body;
+
+        CommandResult(int status, JSONObject body) {
+            this.status = status;
+            this.body = body;
+        }
+    }
+
+    /**
+     * Writes a command result back to the client.
+     *
+     * @param exchange The HTTP exchange object.
+     * @param result The result to send.
+     * @throws IOException if an error occurs while sending the response.
+     */
+    private static void writeResult(HttpExchange exchange, CommandResult result) throws IOException {
+        if (result.body == null) {
+            exchange.sendResponseHeaders(result.status, -1);
+            return;
+        }
+        String jsonResponse = result.body.toString();
+        exchange.sendResponseHeaders(result.status, jsonResponse.length());
+        OutputStream os = exchange.getResponseBody();
+        os.write(jsonResponse.getBytes());
+        os.close();
+    }
+
      /**
      * Handles shutdown requests to terminate the UserService gracefully.
      */
     static class ShutdownHandler implements HttpHandler {
         private final HttpServer server;
-        
+
          /**
          * Constructor to initialize the shutdown handler.
          *
@@ -130,7 +165,7 @@ public class UserService {
         public ShutdownHandler(HttpServer server) {
             this.server = server;
         }
-    
+
         @Override
         public void handle(HttpExchange exchange) throws IOException {
             if ("POST".equalsIgnoreCase(exchange.getRequestMethod())) {
@@ -143,6 +178,38 @@ public class UserService {
         }
     }
 
+    /**
+     * Handles batched commands posted to the `/user/bulk` endpoint.
+     * The request body carries {"commands": [...]} and the response returns
+     * one {"status": ..., "body": ...} entry per command, in order.
+     */
+    static class BulkHandler implements HttpHandler {
+        @Override
+        public void handle(HttpExchange exchange) throws IOException {
+            if (!"POST".equalsIgnoreCase(exchange.getRequestMethod())) {
+                exchange.sendResponseHeaders(405, -1);
+                return;
+            }
+            JSONObject request = new JSONObject(new String(exchange.getRequestBody().readAllBytes()));
+            if (!request.has("commands")) {
+                exchange.sendResponseHeaders(400, -1);
+                return;
+            }
+            JSONArray commands = request.getJSONArray("commands");
+            JSONArray results = new JSONArray();
+            for (int i = 0; i < commands.length(); i++) {
+                CommandResult result = UserHandler.processCommand(commands.getJSONObject(i));
+                JSONObject entry = new JSONObject();
+                entry.put("status", result.status);
+                if (result.body != null) {
+                    entry.put("body", result.body);
+                }
+                results.put(entry);
+            }
+            writeResult(exchange, new CommandResult(200, new JSONObject().put("results", results)));
+        }
+    }
+
        /**
      * Handles incoming HTTP requests for the `/user` endpoint.
      */
@@ -168,9 +235,19 @@ public class UserService {
          */
         private void handlePost(HttpExchange exchange) throws IOException {
             JSONObject request = new JSONObject(new String(exchange.getRequestBody().readAllBytes()));
+            writeResult(exchange, processCommand(request));
+        }
+
+        /**
+         * Applies a single create/update/delete command and returns its result.
+         * Kept free of the HTTP exchange so the bulk endpoint can reuse it.
+         *
+         * @param request The JSON command to apply.
+         * @return The result of the command.
+         */
+        static CommandResult processCommand(JSONObject request) {
             if (!request.has("command") || !request.has("id")) {
-                exchange.sendResponseHeaders(400, -1);
-                return;
+                return new CommandResult(400, null);
             }
 
             String command = request.getString("command");
@@ -180,8 +257,7 @@ public class UserService {
             String username = null;
             if (request.has("username")) {
                 if (!(request.get("username") instanceof String)) {
-                    exchange.sendResponseHeaders(400, -1); // Bad Request
-                    return;
+                    return new CommandResult(400, null); // Bad Request
                 }
                 username = request.getString("username");
             }
@@ -190,8 +266,7 @@ public class UserService {
             String email = null;
             if (request.has("email")) {
                 if (!(request.get("email") instanceof String)) {
-                    exchange.sendResponseHeaders(400, -1); // Bad Request
-                    return;
+                    return new CommandResult(400, null); // Bad Request
                 }
                 email = request.getString("email");
             }
@@ -200,23 +275,20 @@ public class UserService {
             String password = null;
             if (request.has("password")) {
                 if (!(request.get("password") instanceof String)) {
-                    exchange.sendResponseHeaders(400, -1); // Bad Request
-                    return;
+                    return new CommandResult(400, null); // Bad Request
                 }
                 password = hashPassword(request.getString("password"));
             }
-            
+
             try (Connection conn = connectDB()) {
                 if ("create".equals(command)) {
                     if (userExists(id)) {
-                        exchange.sendResponseHeaders(409, -1);
-                        return;
+                        return new CommandResult(409, null);
                     }
 
-                    // Check that the username, email, password exists and are not empty or null 
+                    // Check that the username, email, password exists and are not empty or null
                     if (username == null || email == null || password == null || username.isEmpty() || email.isEmpty() || password.isEmpty()) {
-                        exchange.sendResponseHeaders(400, -1);
-                        return;
+                        return new CommandResult(400, null);
                     }
 
                     String sql = "INSERT INTO users (id, username, email, password) VALUES (?, ?, ?, ?);";
@@ -228,30 +300,26 @@ public class UserService {
                     stmt.executeUpdate();
                 } else if ("update".equals(command)) {
                     if (!userExists(id)) {
-                        exchange.sendResponseHeaders(404, -1);
-                        return;
+                        return new CommandResult(404, null);
                     }
 
-                    // when all three are null 
+                    // when all three are null
                     if (username == null && email == null && password == null) {
-                        sendUpdateResponse(exchange, id);
-                        return;
+                        return fetchUser(id);
                     }
 
                     StringBuilder sql = new StringBuilder("UPDATE users SET ");
                     boolean first = true;
                     if (username != null) {
                         if (username.isEmpty()) {
-                            exchange.sendResponseHeaders(400, -1);
-                            return;
+                            return new CommandResult(400, null);
                         }
                         sql.append("username = ?");
                         first = false;
                     }
                     if (email != null) {
                         if (email.isEmpty()) {
-                            exchange.sendResponseHeaders(400, -1);
-                            return;
+                            return new CommandResult(400, null);
                         }
                         if (!first) sql.append(", ");
                         sql.append("email = ?");
@@ -259,8 +327,7 @@ public class UserService {
                     }
                     if (password != null) {
                         if (password.isEmpty()) {
-                            exchange.sendResponseHeaders(400, -1);
-                            return;
+                            return new CommandResult(400, null);
                         }
                         if (!first) sql.append(", ");
                         sql.append("password = ?");
@@ -277,47 +344,43 @@ public class UserService {
                     int rows = stmt.executeUpdate();
 
                     if (rows > 0 ) {
-                        sendUpdateResponse(exchange, id);
-                        return;
-                    } 
+                        return fetchUser(id);
+                    }
                 } else if ("delete".equals(command)) {
                     if (!userExists(id)) {
-                        exchange.sendResponseHeaders(404, -1);
-                        return;
+                        return new CommandResult(404, null);
                     }
 
                     // Ensure all required fields are provided in the request
                     if (username == null || email == null || password == null) {
-                        exchange.sendResponseHeaders(400, -1); // Bad Request - Missing required fields
-                        return;
+                        return new CommandResult(400, null); // Bad Request - Missing required fields
                     }
-                    // make sure all the fields match to delete user 
-                    // query and find user 
+                    // make sure all the fields match to delete user
+                    // query and find user
                     String sql_find = "SELECT * FROM users WHERE id = ?;";
                     PreparedStatement stmt_find = conn.prepareStatement(sql_find);
                     stmt_find.setInt(1, id);
                     ResultSet rs = stmt_find.executeQuery();
 
                     // Match the provided fields with the existing database record
-                    if (!username.equals(rs.getString("username")) || 
-                        !email.equals(rs.getString("email")) || 
-                        !password.equals(rs.getString("password"))) 
+                    if (!username.equals(rs.getString("username")) ||
+                        !email.equals(rs.getString("email")) ||
+                        !password.equals(rs.getString("password")))
                     {
-                        exchange.sendResponseHeaders(400, -1); // Bad Request - Provided data does not match
-                        return;
+                        return new CommandResult(400, null); // Bad Request - Provided data does not match
                     }
 
                     // delete the user
-                
+
                     String sql = "DELETE FROM users WHERE id = ?;";
                     PreparedStatement stmt = conn.prepareStatement(sql);
                     stmt.setInt(1, id);
                     stmt.executeUpdate();
                 }
-                sendJsonResponse(exchange, id, username, email, password );
+                return new CommandResult(200, userJson(id, username, email, password));
             } catch (SQLException e) {
-                exchange.sendResponseHeaders(500, -1);
                 e.printStackTrace();
+                return new CommandResult(500, null);
             }
         }
 
@@ -343,30 +406,7 @@ public class UserService {
                 return;
             }
 
-            sendJsonUserResponse(exchange, id);
-        }
-
-        /**
-         * Establishes a connection to the SQLite database.
-         *
-         * @return A Connection object.
-         * @throws SQLException if the connection fails.
-         */
-        private void sendJsonUserResponse(HttpExchange exchange, int id) throws IOException {
-            try (Connection conn = connectDB()) {
-                String sql = "SELECT * FROM users WHERE id = ?;";
-                PreparedStatement stmt = conn.prepareStatement(sql);
-                stmt.setInt(1, id);
-                ResultSet rs = stmt.executeQuery();
-                if (rs.next()) {
-                    sendJsonResponse(exchange, rs.getInt("id"), rs.getString("username"), rs.getString("email"), rs.getString("password"));
-                } else {
-                    exchange.sendResponseHeaders(404, -1);
-                }
-            } catch (SQLException e) {
-                exchange.sendResponseHeaders(500, -1);
-                e.printStackTrace();
-            }
+            writeResult(exchange, fetchUser(id));
         }
 
         /**
@@ -376,7 +416,7 @@ public class UserService {
          * @return true if the user exists, false otherwise.
          * @throws SQLException if an error occurs while querying the database.
          */
-        private boolean userExists(int id) throws SQLException {
+        private static boolean userExists(int id) throws SQLException {
             try (Connection conn = connectDB()) {
                 String sql = "SELECT COUNT(*) FROM users WHERE id = ?;";
                 PreparedStatement stmt = conn.prepareStatement(sql);
@@ -387,37 +427,30 @@ public class UserService {
         }
 
         /**
-         * Sends a JSON response to the client.
+         * Builds the JSON body describing a user.
          *
-         * @param exchange The HTTP exchange object.
          * @param id The user ID.
          * @param username The username (optional).
          * @param email The email (optional).
          * @param password The password (optional).
-         * @throws IOException if an error occurs while sending the response.
+         * @return The JSON body.
          */
-        private void sendJsonResponse(HttpExchange exchange, int id, String username, String email, String password) throws IOException {
+        private static JSONObject userJson(int id, String username, String email, String password) {
             JSONObject response = new JSONObject();
             response.put("id", id);
             if (username != null) response.put("username", username);
             if (email != null) response.put("email", email);
             if (password != null) response.put("password", password);
-            String jsonResponse = response.toString();
-            exchange.sendResponseHeaders(200, jsonResponse.length());
-            OutputStream os = exchange.getResponseBody();
-            os.write(jsonResponse.getBytes());
-            os.close();
+            return response;
         }
 
         /**
-         * Sends a JSON response back to the client after an update operation.
+         * Looks up a user and returns their current state as a command result.
          *
-         * @param exchange The HTTP exchange object.
-         * @param statusCode The HTTP status code to return.
-         * @param message The message to include in the response.
-         * @throws IOException If an error occurs while sending the response.
+         * @param id The user ID to fetch.
+         * @return The command result (200 with the user, 404 if absent).
          */
-        private void sendUpdateResponse(HttpExchange exchange, int id) throws IOException {
+        private static CommandResult fetchUser(int id) {
             try (Connection conn = connectDB()) {
                 String sql = "SELECT * FROM users WHERE id = ?;";
                 PreparedStatement stmt = conn.prepareStatement(sql);
@@ -425,24 +458,15 @@ public class UserService {
 
                 ResultSet rs = stmt.executeQuery();
                 if (rs.next()) {
-                    JSONObject response = new JSONObject();
-                    response.put("id", rs.getInt("id"));
-                    response.put("username", rs.getString("username"));
-                    response.put("email", rs.getString("email"));
-                    response.put("password", rs.getString("password"));
-                    String jsonResponse = response.toString();
-                    exchange.sendResponseHeaders(200, jsonResponse.length());
-                    OutputStream os = exchange.getResponseBody();
-                    os.write(jsonResponse.getBytes());
-                    os.close();
+                    return new CommandResult(200, userJson(rs.getInt("id"), rs.getString("username"),
+                            rs.getString("email"), rs.getString("password")));
                 } else {
-                    exchange.sendResponseHeaders(404, -1);
+                    return new CommandResult(404, null);
                 }
             } catch (SQLException e) {
-                exchange.sendResponseHeaders(500, -1);
                 e.printStackTrace();
+                return new CommandResult(500, null);
             }
         }
     }
 }
-
@@ -1,201 +1,695 @@
 
 
-import json
+import asyncio
+import atexit
+import logging
+import logging.handlers
+import pickle
+import re
+import socket
+import sqlite3
 import sys
 import os
 import subprocess
+import time
 
 sys.path.append(os.path.join(os.path.dirname(__file__), 'libs'))
 
-import requests
+import httpx
+import orjson
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+log = logging.getLogger(__name__)
+
+# Dispatch concurrency: a bounded queue feeds a fixed pool of consumers, so
+# memory stays flat no matter how many requests a flush covers; overridable
+# with --workers=N
+NUM_CONSUMERS = 32
+QUEUE_DEPTH = 1024
+
+# Collected requests are flushed once this many are pending, so a workload
+# with no shutdown/restart barriers still runs in bounded memory
+FLUSH_THRESHOLD = 4096
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Already-enqueued GET urls, so a repeated read inside a workload is dropped
+# at parse time instead of paying a round-trip; the mutating builders
+# invalidate the matching entry (the re-read after a write goes out again)
+# and --no-cache disables the cache entirely (set to None)
+GET_CACHE_MAX = 4096
+_get_cache = {}
+
+def _invalidate(url):
+    if _get_cache is not None:
+        _get_cache.pop(url, None)
+
+def _cached_get(url):
+    if _get_cache is not None:
+        if url in _get_cache:
+            log.debug(f"Skipping duplicate GET {url}")
+            return None
+        if len(_get_cache) >= GET_CACHE_MAX:
+            _get_cache.clear()
+        _get_cache[url] = True
+    return ("GET", url, None)
+
 def load_config(config_file):
-    """Load service configuration from a JSON file."""
-    with open(config_file, 'r') as f:
-        return json.load(f)
+    """Load service configuration, via a pickle cache keyed on the file mtime."""
+    cache_file = config_file + ".cache"
+    try:
+        # A fresh cache skips the JSON parse and URL formatting entirely
+        if os.path.getmtime(cache_file) >= os.path.getmtime(config_file):
+            with open(cache_file, 'rb') as f:
+                config = pickle.load(f)
+            if "_shutdown_urls" in config:  # reject caches from older formats
+                return config
+    except Exception:
+        pass  # missing, truncated, or corrupt cache: rebuild it below
+
+    with open(config_file, 'rb') as f:
+        config = orjson.loads(f.read())
+    # Service base URLs are formatted once at load time instead of per command
+    config["_urls"] = {
+        "USER": f"http://{config['UserService']['ip']}:{config['UserService']['port']}/user",
+        "PRODUCT": f"http://{config['ProductService']['ip']}:{config['ProductService']['port']}/product",
+        "ORDER": f"http://{config['OrderService']['ip']}:{config['OrderService']['port']}/order",
+    }
+    config["_shutdown_urls"] = [
+        f"http://{config[name]['ip']}:{config[name]['port']}/shutdown"
+        for name in ("UserService", "ProductService", "OrderService",
+                     "InterServiceCommunication")
+    ]
+    try:
+        # Write-then-rename so a run killed mid-dump can't leave a truncated
+        # cache behind
+        tmp_file = cache_file + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(config, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass  # caching is best-effort; a read-only checkout still works
+    return config
+
+# component 1 stuff
+
+# Admin actions go through a single long-running runme.sh control loop over a
+# pair of named pipes, so repeated shutdown/restart/reset commands don't pay a
+# fork+exec of the script (and everything it launches) per call
+CTL_FIFO = "/tmp/a1_services.ctl"
+ACK_FIFO = "/tmp/a1_services.ack"
+
+_control_daemon = None
+
+def _control(command, fallback_flag):
+    """Send a one-letter command to the control daemon and wait for its ack.
 
-# component 1 stuff 
+    The daemon is started on first use; if it cannot come up, fall back to a
+    one-shot runme.sh invocation.
+    """
+    global _control_daemon
+    if _control_daemon is None or _control_daemon.poll() is not None:
+        # A daemon killed uncleanly leaves its FIFOs behind; writing to a
+        # stale one would block forever, so clear them before the new daemon
+        # creates fresh pipes (the readiness poll below must see those, not
+        # the leftovers)
+        for path in (CTL_FIFO, ACK_FIFO):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        _control_daemon = subprocess.Popen(["./runme.sh", "-l"])
+        for _ in range(50):
+            if os.path.exists(CTL_FIFO) and os.path.exists(ACK_FIFO):
+                break
+            time.sleep(0.1)
+        else:
+            log.warning("[WARNING] Control daemon did not start; running runme.sh directly.")
+            _control_daemon = None
+            subprocess.run(["./runme.sh", fallback_flag])
+            return
+    with open(CTL_FIFO, "w") as ctl:
+        ctl.write(command + "\n")
+    with open(ACK_FIFO) as ack:  # blocks until the action has completed
+        ack.readline()
+
+def _quit_control_daemon():
+    """Stop the control daemon, if one was started."""
+    if _control_daemon is not None and _control_daemon.poll() is None:
+        with open(CTL_FIFO, "w") as ctl:
+            ctl.write("Q\n")
+        with open(ACK_FIFO) as ack:
+            ack.readline()
+        _control_daemon.wait()
+
+atexit.register(_quit_control_daemon)
 
+# Set from the loaded config in __main__; shutdown falls back to the script
+# when it is empty (e.g. library use without a config)
+_shutdown_urls = []
+
+# The rows runme.sh's delete_data clears, reachable directly through sqlite3
+_DATABASES = [
+    (os.path.join(BASE_DIR, "compiled", "UserService", "user_service.db"),
+     ("DELETE FROM users;",)),
+    (os.path.join(BASE_DIR, "compiled", "ProductService", "product_service.db"),
+     ("DELETE FROM products;",)),
+    (os.path.join(BASE_DIR, "compiled", "OrderService", "order_service.db"),
+     ("DELETE FROM orders;", "DELETE FROM user_purchases;")),
+]
 
 def shutdown_services():
-    """Trigger service shutdown via Bash script."""
-    print("[INFO] Shutting down all services...")
-    subprocess.run(["./runme.sh", "-s"])  
-    print("[INFO] Services stopped.")
+    """Post /shutdown to every service, reusing the shared HTTP client."""
+    log.info("[INFO] Shutting down all services...")
+    if not _shutdown_urls:
+        _control("S", "-s")
+        log.info("[INFO] Services stopped.")
+        return
+
+    async def _shutdown_all():
+        client = await _get_client()
+        for url in _shutdown_urls:
+            log.info(f"[INFO] Sending shutdown request to {url}")
+            try:
+                await client.post(url, timeout=5)
+            except httpx.HTTPError as e:
+                log.error(f"[ERROR] Failed to reach {url}: {e}")
+
+    _get_loop().run_until_complete(_shutdown_all())
+    log.info("[INFO] Services stopped.")
 
 def restart_services():
     """Restart services and reset databases if necessary."""
-    print("[INFO] Restarting services...")
-    subprocess.run(["./runme.sh", "-r"])  # Recompile Java services
+    log.info("[INFO] Restarting services...")
+    _control("R", "-r")  # Recompiling and relaunching Java needs the script
 
 def reset_databases():
-    """Call the Bash script to reset all databases."""
-    try:
-        print("[INFO] Calling Bash script to delete all database data...")
-        subprocess.run(["./runme.sh", "-d"])  # Calls the delete_data function in Bash
-        print("[INFO] All databases reset successfully.")
-    except Exception as e:
-        print(f"[ERROR] Failed to reset databases: {e}")
+    """Delete all rows from the service databases in-process."""
+    log.info("[INFO] Deleting all database data...")
+    for db_path, statements in _DATABASES:
+        try:
+            with sqlite3.connect(db_path) as conn:
+                for statement in statements:
+                    conn.execute(statement)
+        except sqlite3.Error as e:
+            log.error(f"[ERROR] Failed to reset {db_path}: {e}")
+    if _get_cache is not None:
+        _get_cache.clear()  # every cached read is stale once the rows are gone
+    log.info("[INFO] All databases reset successfully.")
+
 
+# Tokenizer for command lines; matches are pulled lazily below so scanning
+# stops after the 7 tokens a command can have
+TOKEN_RE = re.compile(r"\S+")
+
+def iter_commands(f):
+    """Yield the token list for each real command line, lazily."""
+    for line in f:
+        line = line.strip()
+        if not line or line.startswith("#"):  # Skip empty lines and comments
+            continue
+        parts = []
+        for match in TOKEN_RE.finditer(line):
+            token = match.group()
+            if token.startswith("#"):  # the rest of the line is a comment
+                break
+            parts.append(token)
+            if len(parts) == 7:
+                break
+        yield parts
 
 def parse_workload(workload_file, config):
     """Parse and process commands from the workload file."""
 
-    with open(workload_file, 'r') as f:
-        lines = f.readlines()
+    urls = config["_urls"]
 
-    if not lines:  # If the workload file is empty, just return
-        print("[INFO] Workload file is empty. Nothing to process.")
-        return
-     
-    first_command_processed = False #ensures that first command checks for restart
+    # Independent commands are collected here and dispatched concurrently;
+    # shutdown/restart act as ordering barriers that flush what is pending.
+    # Consecutive same-service POSTs are folded into bulk requests first.
+    pending = []
+    batcher = CommandBatcher(pending, urls)
 
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if not line or line.startswith("#"):  # Skip empty lines and comments
-            continue
+    # Lines are consumed lazily off the file object, so memory stays flat no
+    # matter how large the workload is
+    with open(workload_file, 'r') as f:
+        commands = iter_commands(f)
 
-        parts = line.split()
-        command = parts[0].lower()
+        # Preflight: a workload may open with `shutdown` (stop whatever is
+        # still running) and/or `restart` (relaunch, retaining the database);
+        # anything else resets the database before the first command runs
+        first = next(commands, None)
+        if first is None:  # If the workload file is empty, just return
+            log.info("[INFO] Workload file is empty. Nothing to process.")
+            return
 
-        if not first_command_processed:  # Process the actual first valid command
-            first_command_processed = True
+        if first[0].lower() == "shutdown":
+            log.info("[INFO] Shutdown detected at startup. Stopping services...")
+            shutdown_services()
+            first = next(commands, None)
+            if first is None:
+                return
 
-            if command == "restart":
-                print("[INFO] Restart detected at startup. Retaining database.")
-                restart_services()
-            else:
-                print("[WARNING] Restart not detected at startup. Resetting database.")
-                reset_databases()
-                process_command(parts, config)
+        if first[0].lower() == "restart":
+            log.info("[INFO] Restart detected at startup. Retaining database.")
+            restart_services()
         else:
+            log.warning("[WARNING] Restart not detected at startup. Resetting database.")
+            reset_databases()
+            request = process_command(first, urls)
+            if request:
+                batcher.add(first[0].upper(), request)
+
+        for parts in commands:
+            command = parts[0].lower()
+
             if command == "shutdown":
-                print("[INFO] Received shutdown command. Stopping services...")
+                log.info("[INFO] Received shutdown command. Stopping services...")
+                batcher.flush()
+                flush_requests(pending)
                 shutdown_services()
                 return  # Stop processing further commands
             elif command == "restart":
-                print("[INFO] Received restart command. Restarting services and resetting databases...")
+                log.info("[INFO] Received restart command. Restarting services and resetting databases...")
+                batcher.flush()
+                flush_requests(pending)
                 reset_databases()
                 restart_services()
             else:
-                # Process other commands
-                process_command(parts, config)
-
-def process_command(parts, config):
-    """Process user, product, and order service commands."""
-    service = parts[0].upper()
-    command = parts[1].lower()
-
-    if service == "USER":
-        url = f"http://{config['UserService']['ip']}:{config['UserService']['port']}/user"
-        if command == "create":
-            payload = {
-                "command": "create",
-                "id": int(parts[2]),
-                "username": parts[3],
-                "email": parts[4],
-                "password": parts[5],
-            }
-        elif command == "update":
-            payload = {
-                "command": "update",
-                "id": int(parts[2]),
-            }
-            for field in parts[3:]:
-                key, value = field.split(":")
-                payload[key] = value
-        elif command == "delete":
-            payload = {"command": "delete", "id": int(parts[2])}
-        elif command == "get":
-            url = f"{url}/{int(parts[2])}"
-            send_request("GET", url)
-            return
-        else:
-            print(f"Unknown USER command: {command}")
-            return
-        send_request("POST", url, payload)
+                # Collect other commands for concurrent dispatch; reads are
+                # ordering barriers, so everything already collected is
+                # dispatched to completion before a GET is enqueued
+                request = process_command(parts, urls)
+                if request:
+                    if request[0] == "GET":
+                        batcher.flush()
+                        flush_requests(pending)
+                    batcher.add(parts[0].upper(), request)
+                if len(pending) >= FLUSH_THRESHOLD:
+                    flush_requests(pending)
 
-    elif service == "PRODUCT":
-        url = f"http://{config['ProductService']['ip']}:{config['ProductService']['port']}/product"
-        if command == "create":
-            if len(parts) < 7:
-                print("Invalid command format: create <id> <name> <description> <price> <quantity>")
-                return
-            payload = {
-                "command": "create",
-                "id": int(parts[2]),
-                "name": parts[3],
-                "description": parts[4],
-                "price": float(parts[5]),
-                "quantity": int(parts[6]),
-            }
-        elif command == "update":
-            payload = {"command": "update", "id": int(parts[2])}
-            for field in parts[3:]:
-                key, value = field.split(":")
-                payload[key] = value
-                if key == "price":
-                    payload[key] = float(value)
-                elif key == "quantity":
-                    payload[key] = int(value)
-        elif command == "delete":
-            payload = {"command": "delete", "id": int(parts[2])}
-        elif command == "info":
-            url = f"{url}/{int(parts[2])}"
-            send_request("GET", url)
-            return
+    batcher.flush()
+    flush_requests(pending)
+
+def compile_workload(workload_file, output_file, config):
+    """Pre-parse a workload into a pickled list of ready-to-send entries.
+
+    Each entry is ("CTL", action, None) for admin commands or
+    (method, url, body_bytes) for HTTP commands, so replaying does no
+    tokenizing, casting, or JSON encoding at all.
+    """
+    urls = config["_urls"]
+    entries = []
+    batcher = CommandBatcher(entries, urls)
+
+    with open(workload_file, 'r') as f:
+        commands = iter_commands(f)
+
+        first = next(commands, None)
+        if first is not None and first[0].lower() == "shutdown":
+            entries.append(("CTL", "shutdown-first", None))
+            first = next(commands, None)
+        if first is not None:
+            if first[0].lower() == "restart":
+                entries.append(("CTL", "restart-first", None))
+            else:
+                if _get_cache is not None:
+                    _get_cache.clear()  # the replayed reset wipes every row
+                entries.append(("CTL", "reset", None))
+                request = process_command(first, urls)
+                if request:
+                    batcher.add(first[0].upper(), request)
+
+            for parts in commands:
+                command = parts[0].lower()
+                if command == "shutdown":
+                    batcher.flush()
+                    entries.append(("CTL", "shutdown", None))
+                    break
+                elif command == "restart":
+                    batcher.flush()
+                    # reset_databases only runs at replay time, so the dedup
+                    # cache must be cleared here or the post-restart re-read
+                    # would be dropped from the blob
+                    if _get_cache is not None:
+                        _get_cache.clear()
+                    entries.append(("CTL", "restart", None))
+                else:
+                    request = process_command(parts, urls)
+                    if request:
+                        batcher.add(parts[0].upper(), request)
+            batcher.flush()
+
+    compiled = [(method, url, orjson.dumps(payload) if payload is not None else None)
+                if method != "CTL" else (method, url, payload)
+                for method, url, payload in entries]
+
+    with open(output_file, 'wb') as out:
+        pickle.dump(compiled, out, protocol=pickle.HIGHEST_PROTOCOL)
+    log.info(f"[INFO] Compiled {len(compiled)} workload entries to {output_file}")
+
+def run_compiled(blob_file):
+    """Replay a workload blob produced by --compile."""
+    with open(blob_file, 'rb') as f:
+        entries = pickle.load(f)
+
+    if not entries:
+        log.info("[INFO] Compiled workload is empty. Nothing to process.")
+        return
+
+    pending = []
+    for method, arg, body in entries:
+        if method != "CTL":
+            if method == "GET":
+                # Reads are ordering barriers here too: drain what is pending
+                flush_requests(pending)
+            pending.append((method, arg, body))
+            if len(pending) >= FLUSH_THRESHOLD:
+                flush_requests(pending)
         else:
-            print(f"Unknown PRODUCT command: {command}")
+            if arg == "shutdown-first":
+                log.info("[INFO] Shutdown detected at startup. Stopping services...")
+                shutdown_services()
+            elif arg == "restart-first":
+                log.info("[INFO] Restart detected at startup. Retaining database.")
+                restart_services()
+            elif arg == "reset":
+                log.warning("[WARNING] Restart not detected at startup. Resetting database.")
+                reset_databases()
+            elif arg == "shutdown":
+                log.info("[INFO] Received shutdown command. Stopping services...")
+                flush_requests(pending)
+                shutdown_services()
+                return
+            elif arg == "restart":
+                log.info("[INFO] Received restart command. Restarting services and resetting databases...")
+                flush_requests(pending)
+                reset_databases()
+                restart_services()
+
+    flush_requests(pending)
+
+# Numeric casts for key:value update fields, applied by field name
+CASTERS = {"price": float, "quantity": int, "id": int}
+
+def _user_create(parts, urls):
+    # One unpack and one cast instead of repeated indexing per field
+    _, _, id_s, username, email, password, *_ = parts
+    uid = int(id_s)
+    _invalidate(f"{urls['USER']}/{uid}")
+    return ("POST", urls["USER"], {
+        "command": "create",
+        "id": uid,
+        "username": username,
+        "email": email,
+        "password": password,
+    })
+
+def _user_update(parts, urls):
+    uid = int(parts[2])
+    _invalidate(f"{urls['USER']}/{uid}")
+    payload = {
+        "command": "update",
+        "id": uid,
+    }
+    for field in parts[3:]:
+        key, _, value = field.partition(":")
+        payload[key] = CASTERS.get(key, str)(value)
+    return ("POST", urls["USER"], payload)
+
+def _user_delete(parts, urls):
+    uid = int(parts[2])
+    _invalidate(f"{urls['USER']}/{uid}")
+    return ("POST", urls["USER"], {"command": "delete", "id": uid})
+
+def _user_get(parts, urls):
+    id_s = parts[2]
+    if not id_s.isdigit():
+        log.warning(f"Invalid USER get id: {id_s}")
+        return None
+    # Plain concatenation: the base url is prebuilt and the id was just validated
+    return _cached_get(urls["USER"] + "/" + id_s)
+
+def _product_create(parts, urls):
+    if len(parts) < 7:
+        log.warning("Invalid command format: create <id> <name> <description> <price> <quantity>")
+        return None
+    _, _, id_s, name, description, price_s, quantity_s = parts
+    pid = int(id_s)
+    _invalidate(f"{urls['PRODUCT']}/{pid}")
+    return ("POST", urls["PRODUCT"], {
+        "command": "create",
+        "id": pid,
+        "name": name,
+        "description": description,
+        "price": float(price_s),
+        "quantity": int(quantity_s),
+    })
+
+def _product_update(parts, urls):
+    pid = int(parts[2])
+    _invalidate(f"{urls['PRODUCT']}/{pid}")
+    payload = {"command": "update", "id": pid}
+    for field in parts[3:]:
+        key, _, value = field.partition(":")
+        payload[key] = CASTERS.get(key, str)(value)
+    return ("POST", urls["PRODUCT"], payload)
+
+def _product_delete(parts, urls):
+    pid = int(parts[2])
+    _invalidate(f"{urls['PRODUCT']}/{pid}")
+    return ("POST", urls["PRODUCT"], {"command": "delete", "id": pid})
+
+def _product_info(parts, urls):
+    id_s = parts[2]
+    if not id_s.isdigit():
+        log.warning(f"Invalid PRODUCT info id: {id_s}")
+        return None
+    return _cached_get(urls["PRODUCT"] + "/" + id_s)
+
+def _order_place(parts, urls):
+    if len(parts) < 5:
+        log.warning("Invalid command format: place <product_id> <user_id> <quantity>")
+        return None
+    _, _, product_s, user_s, quantity_s, *_ = parts
+    product_id = int(product_s)
+    # a placed order changes the product's remaining quantity
+    _invalidate(f"{urls['PRODUCT']}/{product_id}")
+    return ("POST", urls["ORDER"], {
+        "command": "place order",
+        "product_id": product_id,
+        "user_id": int(user_s),
+        "quantity": int(quantity_s),
+    })
+
+# Every (service, command) pair maps straight to its request builder, so the
+# hot loop does one dict lookup instead of walking nested if/elif chains
+HANDLERS = {
+    ("USER", "create"): _user_create,
+    ("USER", "update"): _user_update,
+    ("USER", "delete"): _user_delete,
+    ("USER", "get"): _user_get,
+    ("PRODUCT", "create"): _product_create,
+    ("PRODUCT", "update"): _product_update,
+    ("PRODUCT", "delete"): _product_delete,
+    ("PRODUCT", "info"): _product_info,
+    ("ORDER", "place"): _order_place,
+}
+
+SERVICES = {"USER", "PRODUCT", "ORDER"}
+
+# Upper bound on how many payloads are folded into one bulk POST
+MAX_BATCH = 64
+
+class CommandBatcher:
+    """Folds consecutive same-service POST payloads into one bulk request.
+
+    UserService and ProductService expose /bulk endpoints that apply a
+    {"commands": [...]} array in order; grouping runs of creates/updates/
+    deletes into one POST amortizes the HTTP round-trip per command. ORDER
+    commands pass through untouched (each order coordinates with ISCS on the
+    server side, so there is no bulk endpoint for them). GETs additionally
+    act as ordering barriers: the callers drain everything pending before
+    enqueueing one, so a read never races the writes that precede it.
+    """
+
+    BULK_SERVICES = {"USER", "PRODUCT"}
+
+    def __init__(self, out, urls):
+        self.out = out
+        self.urls = urls
+        self.service = None
+        self.payloads = []
+
+    def add(self, service, request):
+        method = request[0]
+        if method != "POST" or service not in self.BULK_SERVICES:
+            self.flush()
+            self.out.append(request)
             return
-        send_request("POST", url, payload)
+        if service != self.service:
+            self.flush()
+            self.service = service
+        self.payloads.append(request[2])
+        if len(self.payloads) >= MAX_BATCH:
+            self.flush()
 
-    elif service == "ORDER":
-        url = f"http://{config['OrderService']['ip']}:{config['OrderService']['port']}/order"
-        if command == "place":
-            if len(parts) < 5:
-                print("Invalid command format: place <product_id> <user_id> <quantity>")
-                return
-            payload = {
-                "command": "place order",
-                "product_id": int(parts[2]),
-                "user_id": int(parts[3]),
-                "quantity": int(parts[4]),
-            }
-            send_request("POST", url, payload)
+    def flush(self):
+        if self.payloads:
+            self.out.append(("POST", f"{self.urls[self.service]}/bulk",
+                             {"commands": self.payloads}))
+            self.payloads = []
+        self.service = None
+
+def process_command(parts, urls):
+    """Build the (method, url, payload) request for a workload command."""
+    if len(parts) < 2:
+        log.warning(f"Malformed command: {parts[0]}")
+        return None
+
+    # Interned keys make the HANDLERS lookup a pointer comparison
+    service = sys.intern(parts[0].upper())
+    command = sys.intern(parts[1].lower())
+
+    handler = HANDLERS.get((service, command))
+    if handler is None:
+        if service in SERVICES:
+            log.warning(f"Unknown {service} command: {command}")
         else:
-            print(f"Unknown ORDER command: {command}")
-    else:
-        print(f"Unknown service: {service}")
+            log.warning(f"Unknown service: {service}")
+        return None
+    return handler(parts, urls)
 
-def send_request(method, url, payload=None):
-    """Send an HTTP request and print the response."""
-    print(f"\n Sending {method} request to {url}")
+async def send_request(client, method, url, payload=None):
+    """Send an HTTP request and log the response."""
+    log.debug(f"\n Sending {method} request to {url}")
     try:
-        if method == "POST":
-            response = requests.post(url, json=payload)
-        elif method == "GET":
-            response = requests.get(url)
+        # Serialize with orjson and pass the body directly so httpx does not
+        # run the payload through stdlib json.dumps; compiled workloads hand
+        # in bytes that are already encoded
+        if payload is None or isinstance(payload, bytes):
+            body = payload
         else:
-            print(f"Unknown method: {method}")
-            return
-
-        print(f"Payload: {payload}")
-        print(f"Response Code: {response.status_code}")
-        print(f"Response: {response.json() if response.content else 'No Content'}")
-    except requests.exceptions.RequestException as e:
-        print(f"Request failed: {e}")
+            body = orjson.dumps(payload)
+        headers = JSON_HEADERS if body is not None else None
+        request = client.build_request(method, url, content=body, headers=headers)
+        response = await client.send(request, stream=True)
+        try:
+            # Always drain the body so the connection goes back to the
+            # keep-alive pool, but only decode it when per-request logging
+            # is on
+            body = await response.aread()
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(f"Payload: {payload}")
+                log.debug(f"Response Code: {response.status_code}")
+                log.debug(f"Response: {orjson.loads(body) if body else 'No Content'}")
+        finally:
+            await response.aclose()
+    except httpx.HTTPError as e:
+        log.error(f"Request failed: {e}")
     except Exception as e:
-        print(f"Error handling response: {e}")
+        log.error(f"Error handling response: {e}")
+
+# One event loop and one AsyncClient live for the whole run, so every flush
+# reuses the same keep-alive connections instead of building a fresh pool
+_loop = None
+_client = None
+
+def _get_loop():
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+    return _loop
+
+async def _get_client():
+    global _client
+    if _client is None:
+        # Mirror the sender: one shared bounded keep-alive pool for the whole
+        # run. http2=True only engages via TLS ALPN, so the cleartext services
+        # are served over HTTP/1.1 keep-alive; TCP_NODELAY keeps Nagle from
+        # sitting on the small JSON bodies
+        limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        transport = httpx.AsyncHTTPTransport(
+            http2=True, limits=limits,
+            socket_options=[(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)])
+        _client = httpx.AsyncClient(transport=transport)
+    return _client
+
+def _close_client():
+    if _client is not None:
+        _get_loop().run_until_complete(_client.aclose())
+    if _loop is not None:
+        _loop.close()
+
+atexit.register(_close_client)
+
+def flush_requests(pending):
+    """Dispatch all pending requests concurrently, in batches."""
+    if not pending:
+        return
+    _get_loop().run_until_complete(_send_all(pending))
+    pending.clear()
+
+async def _send_all(requests_list):
+    client = await _get_client()
+    queue = asyncio.Queue(QUEUE_DEPTH)
+
+    async def producer():
+        for request in requests_list:
+            await queue.put(request)
+        for _ in range(NUM_CONSUMERS):
+            await queue.put(None)  # one stop marker per consumer
+
+    async def consumer():
+        while (request := await queue.get()) is not None:
+            await send_request(client, *request)
+
+    await asyncio.gather(producer(),
+                         *(consumer() for _ in range(NUM_CONSUMERS)))
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python workload_parser.py <workload_file.txt> ")
+    flags = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+
+    compiling = "--compile" in flags
+    if (compiling and len(args) != 2) or (not compiling and len(args) != 1):
+        print("Usage: python workload_parser.py [--verbose|--quiet] [--workers=N] [--no-cache] <workload_file.txt|workload.bin> \n"
+              "       python workload_parser.py --compile <workload_file.txt> <output.bin>")
         sys.exit(1)
 
+    for flag in flags:
+        if flag.startswith("--workers="):
+            NUM_CONSUMERS = int(flag.split("=", 1)[1])
+    if "--no-cache" in flags:
+        _get_cache = None
+
+    # Per-request output is DEBUG-only so a plain run is not serialized on
+    # stdout, and records are buffered in blocks of 128 so the dispatch loop
+    # doesn't pay a write() syscall per line (errors still flush eagerly;
+    # logging.shutdown drains the buffer at exit). --quiet keeps only
+    # warnings and errors for batch runs.
+    if "--quiet" in flags:
+        level = logging.WARNING
+    elif "--verbose" in flags:
+        level = logging.DEBUG
+    else:
+        level = logging.INFO
+    buffered = logging.handlers.MemoryHandler(128, flushLevel=logging.ERROR,
+                                              target=logging.StreamHandler())
+    logging.basicConfig(level=level, format="%(message)s", handlers=[buffered])
+    # httpx logs every request at INFO (and httpcore traces at DEBUG), which
+    # would reintroduce the per-request output the DEBUG gate exists to avoid
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("httpcore").setLevel(logging.WARNING)
+
     config_file = os.path.join(BASE_DIR, "config.json")
-    workload_file = os.path.join(BASE_DIR, sys.argv[1])
+    workload_file = os.path.join(BASE_DIR, args[0])
 
     config = load_config(config_file)
-    parse_workload(workload_file, config)
\ No newline at end of file
+    _shutdown_urls = config["_shutdown_urls"]
+    if compiling:
+        compile_workload(workload_file, os.path.join(BASE_DIR, args[1]), config)
+    elif workload_file.endswith(".bin"):
+        run_compiled(workload_file)
+    else:
+        parse_workload(workload_file, config)